@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app import models
 
 def get_top_colleges(db: Session, rank: int, caste: str, gender: str, limit=5):
-    query = db.query(models.Cutoff).filter(
+    # College names are serialized with every cutoff: fetch them in one IN query
+    query = db.query(models.Cutoff).options(selectinload(models.Cutoff.college)).filter(
         models.Cutoff.category.contains(caste.upper()),
         models.Cutoff.rank >= rank
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, UniqueConstraint, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -33,3 +33,10 @@ class Cutoff(Base):
     level = Column(String)  # Home/Other/State level
     year = Column(Integer, default=lambda: datetime.now().year-1)  # Automatically set to current year per instance
     stage = Column(String, default="Stage-I")  # Default to Stage-I
+
+    __table_args__ = (
+        # /recommend runs `rank >= ? ORDER BY rank LIMIT k` with a substring match on
+        # category, so rank leads (a leading category column can't serve LIKE '%..%');
+        # category rides along so non-matching rows are rejected from the index alone
+        Index("ix_cutoffs_rank_category", "rank", "category", postgresql_where=rank.isnot(None)),
+    )
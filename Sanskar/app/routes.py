@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+import threading
+import time
+from collections import OrderedDict
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas import CutoffOut
@@ -6,11 +10,44 @@ from app.crud import get_top_colleges
 
 router = APIRouter()
 
-@router.get("/recommend", response_model=list[CutoffOut])
+# Built once: validates ORM rows and serializes the whole list to JSON in pydantic-core
+_CUTOFF_LIST_ADAPTER = TypeAdapter(list[CutoffOut])
+
+# Cached responses are keyed on this window, so data reloaded by the loader
+# scripts is served at most this many seconds late
+RECOMMEND_CACHE_TTL = 300
+RECOMMEND_CACHE_SIZE = 4096
+
+# (rank, caste, gender, cache_window) -> serialized response, least recently used first
+_recommend_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_recommend_cache_lock = threading.Lock()
+
+def _recommend_json(db: Session, rank: int, caste: str, gender: str) -> bytes:
+    key = (rank, caste, gender, int(time.monotonic() // RECOMMEND_CACHE_TTL))
+    with _recommend_cache_lock:
+        body = _recommend_cache.get(key)
+        if body is not None:
+            _recommend_cache.move_to_end(key)
+            return body
+
+    # Cache miss: query through the injected session (the session only
+    # checks out a connection here, not on cache hits)
+    cutoffs = _CUTOFF_LIST_ADAPTER.validate_python(get_top_colleges(db, rank, caste, gender))
+    body = _CUTOFF_LIST_ADAPTER.dump_json(cutoffs)
+
+    with _recommend_cache_lock:
+        _recommend_cache[key] = body
+        if len(_recommend_cache) > RECOMMEND_CACHE_SIZE:
+            _recommend_cache.popitem(last=False)
+    return body
+
+@router.get("/recommend", responses={200: {"model": list[CutoffOut]}})
 def recommend_colleges(
     rank: int = Query(...),
     caste: str = Query(...),
     gender: str = Query(...),
     db: Session = Depends(get_db)
 ):
-    return get_top_colleges(db, rank, caste, gender)
+    # get_top_colleges only looks at caste.upper() and gender.lower(), so normalize the key
+    body = _recommend_json(db, rank, caste.upper(), gender.lower())
+    return Response(content=body, media_type="application/json")
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 
 class CutoffOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     college: str
     branch: str
     category: str
@@ -9,5 +11,8 @@ class CutoffOut(BaseModel):
     gender: str
     level: str
 
-    class Config:
-        orm_mode = True
+    @field_validator("college", mode="before")
+    @classmethod
+    def college_name(cls, value):
+        # Cutoff.college is the related College row; expose its name
+        return getattr(value, "name", value)
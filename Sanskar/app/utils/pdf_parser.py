@@ -1,157 +1,247 @@
+import logging
+import os
 import re
 import pdfplumber
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models import Cutoff, College
 from app.database import engine
 from datetime import datetime
 
-def extract_cutoffs_from_pdf(file_path: str, db: Session):
-    import unicodedata
-    import re
-    from datetime import datetime
-    from collections import deque
-    from app.models import Cutoff
-    import pdfplumber
-
-    with pdfplumber.open(file_path) as pdf:
-        record_count = 0
-
-        for page_num, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text()
-            if not text:
+logger = logging.getLogger(__name__)
+
+# Compiled once at import time; these run for every PDF page and table cell.
+# _LINE_RE scans a whole page (MULTILINE) for header lines, trying a course code
+# (9–10 digits) before a college code (4–6 digits). [^\S\n] keeps separators on
+# one line and `rest` ends on a non-space, matching the old strip-then-match.
+_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:(?P<course>\d{9,10})|(?P<college>\d{4,6}))[^\S\n]*[-–—]?[^\S\n]*(?P<rest>[^\n]*\S)",
+    re.MULTILINE,
+)
+_RANK_PCT_RE = re.compile(r"(\d+)\s*\(?([\d.]+)\)?")
+_STATUS_RE = re.compile(r"Status\s*:\s*(.+)", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+_UPPER_RE = re.compile(r"[A-Z]")
+_CODE5_RE = re.compile(r"^(\d{5})\s*-\s*(.+)")
+
+# Cutoff rows are inserted in batches of this size
+CUTOFF_BATCH_SIZE = 5000
+# Pages parsed between commits while extracting cutoffs
+PAGE_CHUNK_SIZE = 20
+
+# Open PDF per worker process, keyed by pid so a forked worker never reuses
+# a handle inherited from its parent
+_worker_pdfs = {}
+
+# Category code -> (gender, level); the same few dozen codes repeat on every page
+_CAT_META_CACHE: dict[str, tuple[str, str]] = {}
+
+def _cat_meta(cat: str) -> tuple[str, str]:
+    meta = _CAT_META_CACHE.get(cat)
+    if meta is None:
+        gender = "female" if "L" in cat else "male"
+        level = (
+            "state" if "S" in cat
+            else "other" if "O" in cat
+            else "home"
+        )
+        meta = _CAT_META_CACHE[cat] = (gender, level)
+    return meta
+
+def _collect_course_blocks(text: str):
+    """Collect the college and course headers on a page, in reading order."""
+    course_blocks = []
+    current_college = current_college_code = None
+
+    # NFKC folds full-width digits/dashes; one call per page, and only when needed
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+
+    for line_match in _LINE_RE.finditer(text):
+        course_code = line_match.group('course')
+        if course_code:
+            branch = line_match.group('rest').strip()
+            logger.debug("📘 Detected Course: %s | Code: %s", branch, course_code)
+            course_blocks.append({
+                'college': current_college,
+                'college_code': current_college_code,
+                'course_code': course_code,
+                'branch': branch,
+            })
+        else:
+            current_college_code = line_match.group('college')
+            current_college = line_match.group('rest').strip()
+            logger.debug("🏫 Detected College: %s | Code: %s", current_college, current_college_code)
+
+    return course_blocks
+
+def _parse_page(file_path: str, page_num: int):
+    """Parse one PDF page into cutoff row dicts; runs inside a worker process."""
+    # Opening the document walks its whole page tree, so each worker opens it once
+    key = (os.getpid(), file_path)
+    pdf = _worker_pdfs.get(key)
+    if pdf is None:
+        pdf = _worker_pdfs[key] = pdfplumber.open(file_path)
+
+    page = pdf.pages[page_num - 1]
+    text = page.extract_text()
+    course_blocks = _collect_course_blocks(text) if text else []
+    # Table extraction is the expensive call; pages with no course header
+    # (cover, legends, notes) never have a cutoff table to read
+    tables = page.extract_tables() if course_blocks else []
+    # Drop the page's cached layout objects; each page is read once
+    page.close()
+    if not course_blocks:
+        return []
+
+    rows = []
+    append_row = rows.append
+    rank_pct_match = _RANK_PCT_RE.match
+    year = datetime.now().year - 1
+
+    # Now match each course to one table in sequence
+    if len(tables) != len(course_blocks):
+        logger.warning(
+            "⚠️ Page %d has %d course blocks but %d tables",
+            page_num, len(course_blocks), len(tables),
+        )
+
+    for block, table in zip(course_blocks, tables):
+        if not table or len(table) < 2:
+            continue
+
+        # Build merged header
+        raw_header_1 = table[0]
+        raw_header_2 = table[1] if len(table) > 1 else None
+
+        if raw_header_2:
+            while len(raw_header_2) < len(raw_header_1):
+                raw_header_2.append("")
+
+            merged_header = []
+            for c1, c2 in zip(raw_header_1, raw_header_2):
+                merged = f"{str(c1 or '').strip()}{str(c2 or '').strip()}"
+                merged_header.append(merged)
+        else:
+            merged_header = raw_header_1
+
+        # Extract categories
+        categories = [
+            _WS_RE.sub('', cell.strip().upper())
+            for cell in merged_header[1:]  # Skip first 'Stage' col
+            if cell and _UPPER_RE.search(str(cell))
+        ]
+
+        logger.debug("📋 Page %d | Categories: %s | Branch: %s", page_num, categories, block['branch'])
+
+        # Per-column (category, gender, level), derived once per table
+        cat_meta = [(cat, *_cat_meta(cat)) for cat in categories]
+        block_college = block['college']
+        block_college_code = block['college_code']
+        block_branch = block['branch']
+        block_course_code = block['course_code']
+
+        for row in table[1:]:
+            if not row or not row[0]:
                 continue
 
-            lines = text.split("\n")
-            tables = deque(page.extract_tables())
-            course_blocks = []
-            current_college = current_college_code = None
-
-            # First pass to collect all college and course headers
-            for line in lines:
-                line = unicodedata.normalize("NFKC", line.strip())
-
-                # First match course (9–10 digit), then fallback to college (4–6 digit)
-                course_match = re.match(r"^(\d{9,10})\s*[-–—]?\s*(.+)", line)
-                if course_match:
-                    course_code = course_match.group(1).strip()
-                    branch = course_match.group(2).strip()
-                    print(f"📘 Detected Course: {branch} | Code: {course_code}")
-                    course_blocks.append({
-                        'college': current_college,
-                        'college_code': current_college_code,
-                        'course_code': course_code,
-                        'branch': branch,
-                    })
-                    continue  # skip trying college match if already matched
-
-                college_match = re.match(r"^(\d{4,6})\s*[-–—]?\s*(.+)", line)
-                if college_match:
-                    current_college_code = college_match.group(1).strip()
-                    current_college = college_match.group(2).strip()
-                    print(f"\n🏫 Detected College: {current_college} | Code: {current_college_code}")
-                    continue
+            stage_marker = row[0].strip()
 
-
-            # Now match each course to one table in sequence
-            for block in course_blocks:
-                if not tables:
-                    print(f"⚠️ No table found for course {block['branch']} on page {page_num}")
+            # zip stops at the last category column, like the old bounds check
+            for val, (cat, gender, level) in zip(row[1:], cat_meta):
+                if not val:
                     continue
 
-                table = tables.popleft()
-                if not table or len(table) < 2:
+                val_clean = val.strip().replace('\n', ' ')
+                match = rank_pct_match(val_clean)
+                if not match:
                     continue
 
-                # Build merged header
-                raw_header_1 = table[0]
-                raw_header_2 = table[1] if len(table) > 1 else None
-
-                if raw_header_2:
-                    while len(raw_header_2) < len(raw_header_1):
-                        raw_header_2.append("")
+                # college_id is resolved by the parent process, which owns the DB session
+                append_row({
+                    "college": block_college,
+                    "college_code": block_college_code,
+                    "branch": block_branch,
+                    "course_code": block_course_code,
+                    "category": cat,
+                    "rank": int(match.group(1)),
+                    "percent": float(match.group(2)),
+                    "gender": gender,
+                    "level": level,
+                    "stage": stage_marker,
+                    "year": year,
+                })
+
+    return rows
+
+def extract_cutoffs_from_pdf(file_path: str, db: Session, max_workers: int | None = None):
+    # Resolve college FKs from memory instead of one SELECT per cutoff row;
+    # only the three key columns are selected, as plain row tuples
+    college_rows = db.query(College.id, College.code, College.name).all()
+    college_index = {(code, name): college_id for college_id, code, name in college_rows}
+    missing_colleges = set()
+    pending = []
 
-                    merged_header = []
-                    for c1, c2 in zip(raw_header_1, raw_header_2):
-                        merged = f"{str(c1 or '').strip()}{str(c2 or '').strip()}"
-                        merged_header.append(merged)
-                else:
-                    merged_header = raw_header_1
-
-                # Extract categories
-                categories = [
-                    re.sub(r'\s+', '', cell.strip().upper())
-                    for cell in merged_header[1:]  # Skip first 'Stage' col
-                    if cell and re.search(r'[A-Z]', str(cell))
-                ]
-
-                print(f"📋 Page {page_num} | Categories: {categories} | Branch: {block['branch']}")
-
-                for row in table[1:]:
-                    if not row or not row[0]:
+    with pdfplumber.open(file_path) as pdf:
+        total_pages = len(pdf.pages)
+
+    record_count = 0
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    parse_page = partial(_parse_page, file_path)
+
+    # Pages are parsed in worker processes (each keeps the document open);
+    # results come back in page order and are committed one chunk at a time
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        for chunk_start in range(1, total_pages + 1, PAGE_CHUNK_SIZE):
+            chunk_pages = list(range(chunk_start, min(chunk_start + PAGE_CHUNK_SIZE, total_pages + 1)))
+
+            for page_num, page_rows in zip(chunk_pages, executor.map(parse_page, chunk_pages)):
+                for row in page_rows:
+                    # 1. Look up the College id using the code and name
+                    # (a course seen before any college header on the page has no code)
+                    college_name = row.pop("college")
+                    college_code = row["college_code"]
+                    college_key = (int(college_code) if college_code else None, college_name)
+                    college_id = college_index.get(college_key)
+
+                    if college_id is None:
+                        if college_key not in missing_colleges:
+                            missing_colleges.add(college_key)
+                            logger.warning("❌ College not found in DB: %s (%s)", college_name, college_code)
                         continue
 
-                    stage_marker = row[0].strip()
-                    values = row[1:]
-
-                    for i, val in enumerate(values):
-                        if i >= len(categories):
-                            continue
-                        cat = categories[i]
-                        if not val:
-                            continue
-
-                        val_clean = val.strip().replace('\n', ' ')
-                        match = re.match(r"(\d+)\s*\(?([\d.]+)\)?", val_clean)
-                        if not match:
-                            continue
-
-                        rank = int(match.group(1))
-                        percent = float(match.group(2))
-
-                        gender = "female" if "L" in cat else "male"
-                        level = (
-                            "state" if "S" in cat
-                            else "other" if "O" in cat
-                            else "home"
+                    # 2. Queue the Cutoff row with the foreign key reference
+                    row["college_id"] = college_id
+                    pending.append(row)
+                    if len(pending) >= CUTOFF_BATCH_SIZE:
+                        db.bulk_insert_mappings(Cutoff, pending)
+                        pending.clear()
+
+                    record_count += 1
+                    if debug_enabled:
+                        logger.debug(
+                            "✅ Page %d: %s | %s | Rank: %s | %%: %s",
+                            page_num, row['stage'], row['category'], row['rank'], row['percent'],
                         )
 
-                        # 1. Look up the College object using the code
-                        college_obj = db.query(College).filter_by(
-                            code=block['college_code'],
-                            name=block['college']  # only if you're certain name is available
-                        ).first()
-
-                        if not college_obj:
-                            print(f"❌ College not found in DB: {block['college']} ({block['college_code']})")
-                            continue
-
-                        # 2. Create Cutoff with the foreign key reference
-                        cutoff = Cutoff(
-                            college_id=college_obj.id,  # ✅ Assign FK ID here
-                            college_code=block['college_code'],  # ✅ still useful for easier querying
-                            branch=block['branch'],
-                            course_code=block['course_code'],
-                            category=cat,
-                            rank=rank,
-                            percent=percent,
-                            gender=gender,
-                            level=level,
-                            stage=stage_marker,
-                            year=datetime.now().year - 1
-                        )
-                        db.add(cutoff)
+                logger.info("Page %d: %d cutoff rows parsed", page_num, len(page_rows))
 
-                        record_count += 1
-                        print(f"✅ Page {page_num}: {stage_marker} | {cat} | Rank: {rank} | %: {percent}")
+            # Commit each chunk so a failure late in the file keeps earlier pages
+            if pending:
+                db.bulk_insert_mappings(Cutoff, pending)
+                pending.clear()
+            db.commit()
+            logger.info("💾 Committed pages %d-%d (%d records so far)", chunk_pages[0], chunk_pages[-1], record_count)
 
-        print(f"\n🔍 Final Record Count Before Commit: {record_count}")
-        db.commit()
-        print("✅ All cutoffs saved.")
+    logger.info("🔍 Final Record Count: %d", record_count)
+    logger.info("✅ All cutoffs saved.")
 
 def extract_college_details(line):
     # Match exactly 5-digit college code followed by a hyphen and name
-    match = re.match(r"^(\d{5})\s*-\s*(.+)", line)
+    match = _CODE5_RE.match(line)
     if match:
         code = match.group(1).strip()
         name = match.group(2).strip()
@@ -172,13 +262,13 @@ def load_college_data(pdf_lines, db: Session):
         if code and name:
             # Skip undesired college types
             if any(keyword.lower() in name.lower() for keyword in SKIP_KEYWORDS):
-                print(f"⛔ Skipped (Invalid Type): [{code}] {name}")
+                logger.debug("⛔ Skipped (Invalid Type): [%s] %s", code, name)
                 i += 1
                 continue
 
             # Now safe to access i + 2
             status_line = pdf_lines[i + 2].strip()
-            status_match = re.match(r"Status\s*:\s*(.+)", status_line, re.IGNORECASE)
+            status_match = _STATUS_RE.match(status_line)
             if status_match:
                 full_status = status_match.group(1).strip()
 
@@ -193,9 +283,9 @@ def load_college_data(pdf_lines, db: Session):
                 if college_key not in seen_colleges:
                     colleges_to_add.append((code, name, status, university))
                     seen_colleges.add(college_key)
-                    print(f"➕ Added College: [{code}] {name} ({status}) → {university}")
+                    logger.debug("➕ Added College: [%s] %s (%s) → %s", code, name, status, university)
                 else:
-                    print(f"⏩ Skipped Duplicate: [{code}] {name} ({status}) → {university}")
+                    logger.debug("⏩ Skipped Duplicate: [%s] %s (%s) → %s", code, name, status, university)
 
                 i += 3
                 continue  # move to next block
@@ -212,9 +302,12 @@ def load_college_data(pdf_lines, db: Session):
     confirm = input("\n✅ Commit this data to the database? (yes/no): ").strip().lower()
     if confirm in ('yes', 'y'):
         try:
-            for code, name, status, university in colleges_to_add:
-                college = College(code=code, name=name, status=status, university=university)
-                db.add(college)
+            if colleges_to_add:
+                # One executemany INSERT instead of a unit-of-work entry per college
+                db.execute(insert(College), [
+                    {"code": code, "name": name, "status": status, "university": university}
+                    for code, name, status, university in colleges_to_add
+                ])
             db.commit()
             print("🎉 Data committed successfully.")
         except Exception as e:
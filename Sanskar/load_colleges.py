@@ -1,3 +1,4 @@
+import logging
 from app.database import SessionLocal
 from app.utils.pdf_parser import load_college_data
 import pdfplumber
@@ -15,6 +16,7 @@ def extract_lines(pdf_path):
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     db = SessionLocal()
     try:
         pdf_lines = extract_lines("app/data/mh-cet-cap-1.pdf")  # Adjust path if needed
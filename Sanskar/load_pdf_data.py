@@ -1,15 +1,23 @@
 # load_pdf_data.py
+import logging
 from app.database import SessionLocal, engine
 from app.utils.pdf_parser import extract_cutoffs_from_pdf
 
 # Path to your stored PDF file
 pdf_path = "app/data/mh-cet-cap-1.pdf"
 
-# Create a DB session
-db = SessionLocal()
 
-# Extract and insert cutoffs
-extract_cutoffs_from_pdf(pdf_path, db)
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    # Create a DB session
+    db = SessionLocal()
 
-# Close session
-db.close()
+    # Extract and insert cutoffs
+    extract_cutoffs_from_pdf(pdf_path, db)
+
+    # Close session
+    db.close()
+
+# Guard required: the PDF parser starts worker processes that re-import this module
+if __name__ == "__main__":
+    main()
@@ -32,73 +32,75 @@ def generate_sample_cutoffs():
     
     seat_types = ['State Level', 'Home University', 'Other University']
     
-    # Create empty list to store data
-    data = []
-    
-    # Generate sample data
-    for college_code, college_name in colleges:
-        for course_code, course_name in courses:
-            for category in categories:
-                # Generate realistic rank and percentage values
-                # Top government colleges have lower ranks (better)
-                college_factor = 1.0
-                if 'Government' in college_name:
-                    if 'VJTI' in college_name or 'COEP' in college_name:
-                        college_factor = 0.5  # Top colleges
-                    else:
-                        college_factor = 0.8  # Other government colleges
-                
-                # Certain courses are more competitive
-                course_factor = 1.0
-                if 'Computer' in course_name or 'Information Technology' in course_name:
-                    course_factor = 0.7  # Most competitive
-                elif 'Electronics' in course_name or 'Electrical' in course_name:
-                    course_factor = 0.85
-                    
-                # Different categories have different cutoffs
-                category_factor = 1.0
-                if category == 'GOPENS':
-                    category_factor = 0.6  # Most competitive
-                elif category == 'GOBCS':
-                    category_factor = 0.8
-                elif category == 'TFWS':
-                    category_factor = 0.7
-                
-                # Calculate rank and percentage
-                base_rank = int(np.random.randint(5000, 100000) * college_factor * course_factor * category_factor)
-                # Higher rank (worse) corresponds to lower percentage
-                percentage = 100 - (base_rank / 100000 * 30)  # Range approx 70-95%
-                
-                # Select random status and seat type
-                if 'Government' in college_name:
-                    status = np.random.choice([s for s in statuses if 'Government' in s])
-                else:
-                    status = np.random.choice(statuses)
-                
-                seat_type = np.random.choice(seat_types)
-                
-                # Add to data
-                data.append({
-                    'college_code': college_code,
-                    'college_name': college_name,
-                    'course_code': course_code,
-                    'course_name': course_name,
-                    'category': category,
-                    'rank': base_rank,
-                    'percentage': round(percentage, 2),
-                    'status': status,
-                    'university': '',  # Leave empty for simplicity
-                    'seat_type': seat_type
-                })
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(data)
+    # Generate realistic rank and percentage values for every
+    # (college, course, category) combination at once via broadcasting.
+    # Top government colleges have lower ranks (better)
+    college_factor = np.array([
+        (0.5 if 'VJTI' in name or 'COEP' in name else 0.8) if 'Government' in name else 1.0
+        for _, name in colleges
+    ])
+
+    # Certain courses are more competitive
+    course_factor = np.array([
+        0.7 if 'Computer' in name or 'Information Technology' in name
+        else 0.85 if 'Electronics' in name or 'Electrical' in name
+        else 1.0
+        for _, name in courses
+    ])
+
+    # Different categories have different cutoffs
+    category_factor = np.array([
+        {'GOPENS': 0.6, 'GOBCS': 0.8, 'TFWS': 0.7}.get(category, 1.0)
+        for category in categories
+    ])
+
+    n_colleges, n_courses, n_categories = len(colleges), len(courses), len(categories)
+    shape = (n_colleges, n_courses, n_categories)
+    n_rows = n_colleges * n_courses * n_categories
+
+    rng = np.random.default_rng()
+
+    # Calculate rank and percentage
+    factor = college_factor[:, None, None] * course_factor[None, :, None] * category_factor[None, None, :]
+    base_rank = (rng.integers(5000, 100000, size=shape) * factor).astype(int).ravel()
+    # Higher rank (worse) corresponds to lower percentage
+    percentage = np.round(100 - (base_rank / 100000 * 30), 2)  # Range approx 70-95%
+
+    # Label columns laid out in the same college -> course -> category order as base_rank
+    college_codes, college_names = (np.repeat(col, n_courses * n_categories) for col in zip(*colleges))
+    course_codes, course_names = (np.tile(np.repeat(col, n_categories), n_colleges) for col in zip(*courses))
+
+    # Select random status and seat type; government colleges only get government statuses
+    is_government = np.repeat(['Government' in name for _, name in colleges], n_courses * n_categories)
+    status = np.where(
+        is_government,
+        rng.choice([s for s in statuses if 'Government' in s], size=n_rows),
+        rng.choice(statuses, size=n_rows),
+    )
+    seat_type = rng.choice(seat_types, size=n_rows)
+
+    # Assemble the DataFrame from 1-D columns
+    df = pd.DataFrame({
+        'college_code': college_codes,
+        'college_name': college_names,
+        'course_code': course_codes,
+        'course_name': course_names,
+        'category': np.tile(categories, n_colleges * n_courses),
+        'rank': base_rank,
+        'percentage': percentage,
+        'status': status,
+        'university': '',  # Leave empty for simplicity
+        'seat_type': seat_type
+    })
     
     # Save to CSV
-    df.to_csv('mht_cet_cutoffs.csv', index=False)
+    df.to_csv('mht_cet_cutoffs.csv', index=False, chunksize=10_000, lineterminator='\n')
+    
+    # Also save as Parquet: typed, compressed and much faster to load than CSV
+    df.to_parquet('mht_cet_cutoffs.parquet', engine='pyarrow', compression='zstd', index=False)
     
     print(f"Generated {len(df)} sample cutoff records")
-    print(f"Sample data saved to mht_cet_cutoffs.csv")
+    print(f"Sample data saved to mht_cet_cutoffs.csv and mht_cet_cutoffs.parquet")
     
     return df
 
@@ -1,13 +1,28 @@
 import re
+import csv
 import json
-import pandas as pd
 import os
 import io
 from tqdm import tqdm
 import logging
 import pdfplumber  # More powerful PDF parsing library
 import traceback
-from collections import defaultdict
+from collections import defaultdict, deque
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+
+try:
+    import orjson  # Rust-backed JSON encoder; optional, json is used without it
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick  # pyahocorasick; optional, speeds up the page pre-filter
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logging.basicConfig(
@@ -22,36 +37,131 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Set to True to enable more detailed debugging
-DEBUG = True
+DEBUG = False
+
+# Field order of every parsed row in MHTCutoffParser.data
+COLUMNS = (
+    "college_code", "college_name", "course_code", "course_name", "status",
+    "university", "seat_type", "category", "rank", "percentage", "page"
+)
+
+# Rows kept in MHTCutoffParser.sample for the end-of-run summary
+SAMPLE_SIZE = 3
+
+# Worker processes used for page extraction
+MAX_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Extracted pages buffered between the extraction thread and the parser
+PIPELINE_DEPTH = 16
+
+# Open PDF per worker process, keyed by pid so a forked worker never reuses
+# a handle inherited from its parent
+_worker_pdfs = {}
+
+def _extract_page(pdf_path, page_idx, extract_tables=False, debug=False):
+    """Extract (text, tables) from one page; runs inside a worker process."""
+    key = (os.getpid(), pdf_path)
+    pdf = _worker_pdfs.get(key)
+    if pdf is None:
+        pdf = _worker_pdfs[key] = pdfplumber.open(pdf_path)
+    
+    text, tables = "", []
+    try:
+        page = pdf.pages[page_idx]
+        
+        # Extract text
+        text = page.extract_text() or ""
+        
+        # Table extraction is a second full layout pass, so only do it on request
+        if extract_tables:
+            tables = page.extract_tables()
+        
+        # Drop the page's cached layout objects; each page is read once
+        page.close()
+    except Exception as e:
+        logger.error(f"Error extracting text from page {page_idx+1}: {str(e)}")
+        if debug:
+            logger.error(traceback.format_exc())
+    return text, tables
+
+def _dumps(obj):
+    """Serialize obj to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _open_json_array(f):
+    """Start a JSON array in binary file f; return a function that appends one row as a record."""
+    f.write(b'[')
+    first = True
+    
+    def write_row(row):
+        nonlocal first
+        f.write(b'\n  ' if first else b',\n  ')
+        first = False
+        f.write(_dumps(dict(zip(COLUMNS, row))))
+    
+    return write_row
+
+def _close_json_array(f):
+    f.write(b'\n]\n')
 
 class MHTCutoffParser:
-    def __init__(self, pdf_path):
-        """Initialize the parser with the PDF file path."""
+    def __init__(self, pdf_path, extract_tables=False, save_debug_images=False):
+        """Initialize the parser with the PDF file path.
+        
+        extract_tables also collects pdfplumber tables into self.extracted_tables;
+        save_debug_images renders the first 10 pages to PNG for visual inspection.
+        """
         self.pdf_path = pdf_path
-        self.data = []
-        self.raw_data = []  # Store raw extracted data for debugging
+        self.extract_tables = extract_tables
+        self.save_debug_images = save_debug_images
+        self.data = {col: [] for col in COLUMNS}  # One list per column (COLUMNS order)
         
-        # Pattern for college information: 4-digit code followed by name
-        self.college_pattern = re.compile(r'(\d{4})\s*-\s*(.+?)(?=\n|\r|$)')
+        # Kept even when rows are streamed to disk instead of self.data
+        self.streamed = {}  # "csv"/"json" -> path rows were streamed to
+        self.row_count = 0
+        self.sample = []  # First SAMPLE_SIZE rows
+        self.colleges = {}  # college_code -> college_name
+        self.courses = {}  # course_code -> course_name
+        self.categories = set()
         
-        # Pattern for course information: 8-9 digit code followed by name
-        self.course_pattern = re.compile(r'(\d{8,9})\s*-\s*(.+?)(?=\n|\r|Status:|$)')
+        # One shared object per distinct name/status/category string
+        self._intern = {}
+        self.raw_data = []  # Store raw extracted data for debugging
         
-        # Pattern for status information
-        self.status_pattern = re.compile(r'Status:\s*(.+?)(?=\n|\r|Home University|$)')
+        # Pattern for college information: 4-digit code followed by name, at the
+        # start of a line (so "A.Y. 2022-23" in page headers is not a college)
+        self.college_pattern = re.compile(r'^(\d{4})\s*-\s*([^\n\r]+)', re.MULTILINE)
         
-        # Pattern for university information
-        self.university_pattern = re.compile(r'Home University\s*:\s*(.+?)(?=\n|\r|$)')
+        # Pattern for course information: 8-9 digit code followed by name, at the
+        # start of a line. The name class excludes line breaks, so a failed match
+        # never backtracks past the end of the line.
+        self.course_pattern = re.compile(r'^(\d{8,9})\s*-\s*([^\n\r]*?)(?:\s*Status:|$)', re.MULTILINE)
         
-        # Categories often look like GOPENS, GSTS, GOBCS, DEFOPENS, etc.
-        # More comprehensive pattern to capture various category formats
-        self.category_pattern = re.compile(r'^([A-Z][A-Z0-9]+[A-Z0-9]*H?S?)$')
+        # Pattern for status information, at the start of a line
+        self.status_pattern = re.compile(r'^Status:\s*([^\n\r]+?)(?=Home University|$)', re.MULTILINE)
         
-        # Pattern to extract rank (a number by itself on a line)
-        self.rank_pattern = re.compile(r'^(\d{1,6})$')
+        # Pattern for university information. Not anchored: pdfplumber puts it on
+        # the status line ("Status: ... Home University : ...")
+        self.university_pattern = re.compile(r'Home University\s*:\s*(.+?)(?=\n|\r|$)')
         
-        # Pattern to extract percentage (in parentheses)
-        self.percentage_pattern = re.compile(r'^\((\d+\.\d+)\)$')
+        # Every line kind parse_pdf cares about, as one alternation. parse_pdf walks
+        # each page once with finditer and dispatches on m.lastgroup instead of
+        # running each pattern above against every line. A cutoff is a category
+        # line (GOPENS, DEFOPENS, ...: an uppercase letter and 1-11 uppercase
+        # letters or digits) immediately followed by a rank line and a
+        # "(percentage)" line, so the whole triplet is matched at once.
+        self.combined_re = re.compile(
+            r'^(?P<college>(?P<college_code>\d{4})[^\S\n]*-[^\S\n]*(?P<college_name>[^\n\r]+))'
+            r'|^(?P<course>(?P<course_code>\d{8,9})[^\S\n]*-[^\S\n]*(?P<course_name>[^\n\r]+?))(?=Status:|$)'
+            r'|^Status:[^\S\n]*(?P<status>[^\n\r]+?)(?=Home University|$)'
+            r'|Home University[^\S\n]*:[^\S\n]*(?P<univ>[^\n\r]+)'
+            r'|(?P<cutoff>^[^\S\n]*(?P<cat>[A-Z][A-Z0-9]{1,11})[^\S\n]*\n'
+            r'[^\S\n]*(?P<rank>\d{1,6})[^\S\n]*\n'
+            r'[^\S\n]*\((?P<pct>\d+\.\d+)\)[^\S\n]*$)',
+            re.MULTILINE
+        )
         
         # Special handling for known colleges
         self.special_colleges = {
@@ -59,6 +169,19 @@ class MHTCutoffParser:
             "3215": "Bhartiya Vidya Bhavan's Sardar Patel Institute of Technology, Andheri, Mumbai"
         }
         
+        # Literal anchors found on every page that carries cutoff data. Pages
+        # with none of them are skipped before the regex pass.
+        self.anchors = [
+            "Status:", "Home University", "Home University Seats",
+            "Other Than Home University Seats", *self.special_colleges
+        ]
+        self.anchor_automaton = None
+        if ahocorasick is not None:
+            self.anchor_automaton = ahocorasick.Automaton()
+            for anchor in self.anchors:
+                self.anchor_automaton.add_word(anchor, anchor)
+            self.anchor_automaton.make_automaton()
+        
         # Store current parsing state
         self.current_college = None
         self.current_course = None
@@ -69,8 +192,12 @@ class MHTCutoffParser:
         # Debug flag
         self.debug = DEBUG
         
-    def extract_text_from_pdf(self):
-        """Extract text from all pages of the PDF using pdfplumber."""
+    def iter_pages(self):
+        """Yield (page_index, text) for each page in order as it is extracted.
+        
+        A producer thread feeds worker-pool results through a bounded queue, so
+        the caller parses early pages while later ones are still being extracted.
+        """
         logger.info(f"Starting text extraction from {self.pdf_path}")
         
         try:
@@ -78,41 +205,80 @@ class MHTCutoffParser:
                 num_pages = len(pdf.pages)
                 logger.info(f"PDF has {num_pages} pages")
                 
-                all_text = []
-                all_tables = []
-                
-                for i in tqdm(range(num_pages), desc="Extracting text from PDF"):
-                    try:
-                        page = pdf.pages[i]
-                        
-                        # Extract text
-                        text = page.extract_text()
-                        all_text.append(text)
-                        
-                        # Also extract tables for more structured data
-                        tables = page.extract_tables()
-                        if tables:
-                            all_tables.append((i+1, tables))
-                            
-                        # Debug: Save first few pages as images for visual inspection
-                        if self.debug and i < 10:
-                            img = page.to_image()
-                            img.save(f"debug_page_{i+1}.png")
-                            
-                    except Exception as e:
-                        logger.error(f"Error extracting text from page {i+1}: {str(e)}")
-                        if self.debug:
-                            logger.error(traceback.format_exc())
-                
-                # Store tables for later processing
-                self.extracted_tables = all_tables
-                
-                return all_text
+                # Debug: Save first few pages as images for visual inspection.
+                # Rendering stays in this process; page images don't travel well between workers
+                if self.save_debug_images:
+                    for i in range(min(num_pages, 10)):
+                        try:
+                            pdf.pages[i].to_image().save(f"debug_page_{i+1}.png")
+                        except Exception as e:
+                            logger.error(f"Error saving debug image for page {i+1}: {str(e)}")
+                            if self.debug:
+                                logger.error(traceback.format_exc())
         except Exception as e:
             logger.error(f"Error opening PDF: {str(e)}")
             if self.debug:
                 logger.error(traceback.format_exc())
-            return []
+            return
+        
+        # Store tables for later processing; filled in by the producer
+        self.extracted_tables = []
+        pages = queue.Queue(maxsize=PIPELINE_DEPTH)
+        stop = threading.Event()
+        
+        def produce():
+            # Pages are independent, so extraction is spread across processes.
+            # At most PIPELINE_DEPTH pages are submitted ahead of the one being
+            # handed over, so a slow consumer also holds back extraction.
+            extract_page = partial(
+                _extract_page, self.pdf_path,
+                extract_tables=self.extract_tables, debug=self.debug
+            )
+            executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+            in_flight = deque()  # (page_index, future), in page order
+            next_page = 0
+            try:
+                while next_page < num_pages or in_flight:
+                    while next_page < num_pages and len(in_flight) < PIPELINE_DEPTH:
+                        in_flight.append((next_page, executor.submit(extract_page, next_page)))
+                        next_page += 1
+                    if stop.is_set():
+                        break
+                    
+                    i, future = in_flight.popleft()
+                    text, tables = future.result()
+                    
+                    # Also keep tables for more structured data
+                    if tables:
+                        self.extracted_tables.append((i+1, tables))
+                    pages.put((i, text))
+            except Exception as e:
+                logger.error(f"Error extracting text from PDF: {str(e)}")
+                if self.debug:
+                    logger.error(traceback.format_exc())
+            finally:
+                # Pages not yet started are dropped if the consumer stopped early
+                executor.shutdown(cancel_futures=True)
+                pages.put(None)  # Sentinel: no more pages
+        
+        producer = threading.Thread(target=produce, name="pdf-extract", daemon=True)
+        producer.start()
+        item = ()
+        try:
+            with tqdm(total=num_pages, desc="Processing pages") as progress:
+                while (item := pages.get()) is not None:
+                    yield item
+                    progress.update()
+        finally:
+            # If the consumer stopped early, unblock the producer and let it finish
+            stop.set()
+            while item is not None:
+                item = pages.get()
+            producer.join()
+    
+    def extract_text_from_pdf(self):
+        """Extract text from all pages of the PDF, in page order."""
+        return [text for _, text in self.iter_pages()]
     
     def parse_college_info(self, text):
         """Extract college code and name from text."""
@@ -161,73 +327,110 @@ class MHTCutoffParser:
         else:
             return "State Level"
     
-    def is_category(self, text):
-        """Check if the given text is a category code."""
-        return self.category_pattern.match(text) is not None
-    
-    def is_rank(self, text):
-        """Check if the given text is a rank number."""
-        return self.rank_pattern.match(text) is not None
+    def _i(self, s):
+        """Return the shared copy of string s."""
+        return self._intern.setdefault(s, s)
     
-    def is_percentage(self, text):
-        """Check if the given text is a percentage value."""
-        return self.percentage_pattern.match(text) is not None
+    def has_anchor(self, text):
+        """Check if the given page text contains any cutoff-data anchor."""
+        if self.anchor_automaton is not None:
+            # One linear scan for all anchors; stop at the first hit
+            for _ in self.anchor_automaton.iter(text):
+                return True
+            return False
+        return any(anchor in text for anchor in self.anchors)
     
-    def extract_category_rank_percentage(self, lines):
-        """
-        Extract categories, ranks, and percentages from a list of lines.
-        Returns a dict mapping categories to (rank, percentage) tuples.
+    def parse_pdf(self, output_csv=None, output_json=None):
+        """Parse the entire PDF and extract structured data.
+        
+        With output_csv and/or output_json, rows are written to those files as
+        they are parsed instead of being kept in self.data; only row_count, the
+        college/course/category summaries and a small sample stay in memory.
+        Rows go to temporary files that replace the outputs only if any rows
+        were parsed, so a failed run leaves existing outputs untouched.
         """
-        cutoffs = {}
-        i = 0
+        logger.info("Starting PDF parsing")
+        self.streamed = {
+            fmt: path for fmt, path in (("csv", output_csv), ("json", output_json)) if path
+        }
+        outputs = list(self.streamed.values())
+        rows_before = self.row_count
         
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                i += 1
-                continue
-                
-            # Check if this line contains a category
-            if self.is_category(line):
-                category = line
+        try:
+            with ExitStack() as stack:
+                sinks = []
+                if output_csv:
+                    f = stack.enter_context(open(output_csv + '.tmp', 'w', encoding='utf-8', newline=''))
+                    writer = csv.writer(f)
+                    writer.writerow(COLUMNS)
+                    sinks.append(writer.writerow)
+                if output_json:
+                    f = stack.enter_context(open(output_json + '.tmp', 'wb'))
+                    sinks.append(_open_json_array(f))
+                    stack.callback(_close_json_array, f)
                 
-                # Look ahead for rank and percentage
-                if i + 2 < len(lines):
-                    rank_line = lines[i+1].strip()
-                    percentage_line = lines[i+2].strip()
+                if not sinks:
+                    # Each column's append bound once, so a row costs eleven direct calls
+                    (add_college_code, add_college_name, add_course_code, add_course_name,
+                     add_status, add_university, add_seat_type, add_category, add_rank,
+                     add_percentage, add_page) = [self.data[col].append for col in COLUMNS]
                     
-                    rank_match = self.rank_pattern.match(rank_line)
-                    percentage_match = self.percentage_pattern.match(percentage_line)
-                    
-                    if rank_match and percentage_match:
-                        rank = int(rank_match.group(1))
-                        percentage = float(percentage_match.group(1))
-                        
-                        cutoffs[category] = {
-                            "rank": rank,
-                            "percentage": percentage
-                        }
-                        
-                        logger.debug(f"Found cutoff: {category} - Rank: {rank}, Percentage: {percentage}")
-                        i += 3  # Skip the next two lines (rank and percentage)
-                        continue
-            
-            i += 1
+                    def emit(entry):
+                        (college_code, college_name, course_code, course_name, status,
+                         university, seat_type, category, rank, percentage, page) = entry
+                        add_college_code(college_code)
+                        add_college_name(college_name)
+                        add_course_code(course_code)
+                        add_course_name(course_name)
+                        add_status(status)
+                        add_university(university)
+                        add_seat_type(seat_type)
+                        add_category(category)
+                        add_rank(rank)
+                        add_percentage(percentage)
+                        add_page(page)
+                elif len(sinks) == 1:
+                    emit = sinks[0]
+                else:
+                    def emit(entry):
+                        for sink in sinks:
+                            sink(entry)
+                
+                pages_seen = self._parse_pages(emit)
             
-        return cutoffs
-
-    def parse_pdf(self):
-        """Parse the entire PDF and extract structured data."""
-        logger.info("Starting PDF parsing")
+            saved = self.row_count > rows_before
+            if saved:
+                for path in outputs:
+                    os.replace(path + '.tmp', path)
+        finally:
+            # Left over only if nothing was parsed or parsing failed
+            for path in outputs:
+                if os.path.exists(path + '.tmp'):
+                    os.remove(path + '.tmp')
         
-        # Extract text from PDF
-        pages_text = self.extract_text_from_pdf()
-        if not pages_text:
+        if not pages_seen:
             logger.error("Failed to extract text from PDF")
             return
         
+        # Check if we found special colleges
+        for code in self.special_colleges:
+            if code in self.colleges:
+                logger.info(f"Successfully extracted data for special college: {code} - {self.special_colleges[code]}")
+            else:
+                logger.warning(f"No data found for special college: {code} - {self.special_colleges[code]}")
+        
+        logger.info(f"Parsing complete. Extracted {self.row_count} entries.")
+        for path in outputs:
+            if saved:
+                logger.info(f"Saved {self.row_count} records to {path}")
+            else:
+                logger.warning(f"No records extracted; left {path} unchanged")
+    
+    def _parse_pages(self, emit):
+        """Run the parse loop over every page, passing each row to emit.
+        
+        Returns the number of pages seen.
+        """
         # Initialize variables to track current state
         current_college_code = None
         current_college_name = None
@@ -237,149 +440,121 @@ class MHTCutoffParser:
         current_university = None
         current_seat_type = "State Level"  # Default seat type
         
-        # Process pages sequentially as the information may span multiple pages
-        for i, text in tqdm(enumerate(pages_text), desc="Parsing pages", total=len(pages_text)):
+        # Bind hot-loop lookups to locals
+        finditer = self.combined_re.finditer
+        has_anchor = self.has_anchor
+        special = self.special_colleges
+        _i = self._i
+        sample = self.sample
+        colleges = self.colleges
+        courses = self.courses
+        categories = self.categories
+        row_count = 0
+        
+        # Process pages sequentially as the information may span multiple pages;
+        # iter_pages keeps extracting ahead while each page is parsed
+        i = -1
+        for i, text in self.iter_pages():
             if self.debug and i < 20:
                 logger.info(f"Processing page {i+1}, content sample: {text[:100]}...")
-                
-            lines = text.split('\n')
-            j = 0
             
-            while j < len(lines):
-                line = lines[j].strip()
-                
-                # Skip header lines and empty lines
-                if not line or "Government of Maharashtra" in line or "State Common Entrance Test Cell" in line:
-                    j += 1
-                    continue
+            # Cover, legend and blank pages have no anchors and no cutoffs. A page
+            # that only continues the previous page's course has no anchor
+            # either, so pages are skipped only while no course is active.
+            if current_course_code is None and not has_anchor(text):
+                continue
+            
+            # Seat type is a property of the page; looked up once, on its first course
+            page_seat_type = None
+            
+            for m in finditer(text):
+                kind = m.lastgroup
                 
-                # Try to match college pattern
-                college_match = self.college_pattern.search(line)
-                if college_match:
-                    current_college_code = college_match.group(1)
-                    current_college_name = college_match.group(2).strip()
+                if kind == 'cutoff':
+                    if not (current_college_code and current_course_code):
+                        continue
+                    category = _i(m.group('cat'))
+                    rank = int(m.group('rank'))
+                    percentage = float(m.group('pct'))
                     
-                    # Apply special handling for known colleges
-                    if current_college_code in self.special_colleges:
-                        current_college_name = self.special_colleges[current_college_code]
+                    # Create entry, in COLUMNS order
+                    entry = (
+                        current_college_code,
+                        current_college_name,
+                        current_course_code,
+                        current_course_name,
+                        current_status or "Unknown",
+                        current_university or "",
+                        current_seat_type,
+                        category,
+                        rank,
+                        percentage,
+                        i+1
+                    )
                     
-                    logger.info(f"Found college: {current_college_code} - {current_college_name} on page {i+1}")
-                    j += 1
+                    emit(entry)
+                    row_count += 1
+                    if row_count <= SAMPLE_SIZE:
+                        sample.append(entry)
+                    colleges[current_college_code] = current_college_name
+                    courses[current_course_code] = current_course_name
+                    categories.add(category)
+                    logger.debug("Added cutoff directly: %s - Rank: %s, Percentage: %s", category, rank, percentage)
                     continue
                 
-                # Try to match course pattern
-                course_match = self.course_pattern.search(line)
-                if course_match and current_college_code:
-                    current_course_code = course_match.group(1)
-                    current_course_name = course_match.group(2).strip()
-                    logger.info(f"Found course: {current_course_code} - {current_course_name} on page {i+1}")
-                    
-                    # Look for status in the next few lines
-                    for k in range(j+1, min(j+5, len(lines))):
-                        status_match = self.status_pattern.search(lines[k])
-                        if status_match:
-                            current_status = status_match.group(1).strip()
-                            logger.debug(f"Found status: {current_status}")
-                            break
-                    
-                    # Look for university in the next few lines
-                    for k in range(j+1, min(j+5, len(lines))):
-                        univ_match = self.university_pattern.search(lines[k])
-                        if univ_match:
-                            current_university = univ_match.group(1).strip()
-                            logger.debug(f"Found university: {current_university}")
-                            break
+                if kind == 'college':
+                    current_college_code = m.group('college_code')
+                    current_college_name = _i(m.group('college_name').strip())
                     
-                    # Determine seat type
-                    current_seat_type = self.determine_seat_type(text)
-                    
-                    # After finding a course, look for category and cutoff data in the next 30-50 lines
-                    next_lines = lines[j+1:min(j+50, len(lines))]
-                    cutoffs = self.extract_category_rank_percentage(next_lines)
-                    
-                    if cutoffs:
-                        for category, cutoff_data in cutoffs.items():
-                            entry = {
-                                "college_code": current_college_code,
-                                "college_name": current_college_name,
-                                "course_code": current_course_code,
-                                "course_name": current_course_name,
-                                "status": current_status or "Unknown",
-                                "university": current_university or "",
-                                "seat_type": current_seat_type,
-                                "category": category,
-                                "rank": cutoff_data["rank"],
-                                "percentage": cutoff_data["percentage"],
-                                "page": i+1
-                            }
-                            
-                            self.data.append(entry)
-                            logger.debug(f"Added cutoff: {category} - Rank: {cutoff_data['rank']}, Percentage: {cutoff_data['percentage']}")
+                    # Apply special handling for known colleges
+                    if current_college_code in special:
+                        current_college_name = special[current_college_code]
                     
-                    j += 1
-                    continue
+                    logger.info(f"Found college: {current_college_code} - {current_college_name} on page {i+1}")
                 
-                # Direct detection of categories and cutoffs (alternative approach)
-                if current_college_code and current_course_code:
-                    # Try to identify if the current line is a category
-                    if self.is_category(line):
-                        category = line
+                elif kind == 'course':
+                    if current_college_code:
+                        current_course_code = m.group('course_code')
+                        current_course_name = _i(m.group('course_name').strip())
+                        logger.info(f"Found course: {current_course_code} - {current_course_name} on page {i+1}")
                         
-                        # Check if the next lines contain rank and percentage
-                        if j+2 < len(lines):
-                            rank_line = lines[j+1].strip()
-                            percentage_line = lines[j+2].strip()
-                            
-                            # Check if we have a valid rank and percentage
-                            if self.is_rank(rank_line) and self.is_percentage(percentage_line):
-                                rank = int(self.rank_pattern.match(rank_line).group(1))
-                                percentage = float(self.percentage_pattern.match(percentage_line).group(1))
-                                
-                                # Create entry
-                                entry = {
-                                    "college_code": current_college_code,
-                                    "college_name": current_college_name,
-                                    "course_code": current_course_code,
-                                    "course_name": current_course_name,
-                                    "status": current_status or "Unknown",
-                                    "university": current_university or "",
-                                    "seat_type": current_seat_type,
-                                    "category": category,
-                                    "rank": rank,
-                                    "percentage": percentage,
-                                    "page": i+1
-                                }
-                                
-                                self.data.append(entry)
-                                logger.debug(f"Added cutoff directly: {category} - Rank: {rank}, Percentage: {percentage}")
-                                
-                                # Skip the processed lines
-                                j += 3
-                                continue
+                        # Determine seat type
+                        if page_seat_type is None:
+                            page_seat_type = self.determine_seat_type(text)
+                        current_seat_type = page_seat_type
                 
-                # Move to next line
-                j += 1
-        
-        # Check if we found special colleges
-        special_colleges_found = set()
-        for item in self.data:
-            if item['college_code'] in self.special_colleges:
-                special_colleges_found.add(item['college_code'])
-        
-        for code in self.special_colleges:
-            if code in special_colleges_found:
-                logger.info(f"Successfully extracted data for special college: {code} - {self.special_colleges[code]}")
-            else:
-                logger.warning(f"No data found for special college: {code} - {self.special_colleges[code]}")
+                elif kind == 'status':
+                    current_status = _i(m.group('status').strip())
+                    logger.debug("Found status: %s", current_status)
+                
+                elif kind == 'univ':
+                    current_university = _i(m.group('univ').strip())
+                    logger.debug("Found university: %s", current_university)
         
-        logger.info(f"Parsing complete. Extracted {len(self.data)} entries.")
+        self.row_count += row_count
+        return i + 1
+    
+    def rows(self):
+        """Iterate over the parsed rows as tuples in COLUMNS order."""
+        return zip(*(self.data[col] for col in COLUMNS))
     
     def save_to_json(self, output_path="mht_cet_cutoffs.json"):
         """Save the parsed data to a JSON file."""
+        if self.streamed:
+            # Streamed rows were never kept in self.data
+            if self.streamed.get("json") == output_path:
+                logger.info(f"Rows were written to {output_path} while parsing; nothing to save")
+                return True
+            logger.error(f"Rows were streamed to {', '.join(self.streamed.values())} while parsing; cannot save {output_path}")
+            return False
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Saved {len(self.data)} records to {output_path}")
+            # Stream one record at a time instead of building a list of dicts
+            with open(output_path, 'wb') as f:
+                write_row = _open_json_array(f)
+                for row in self.rows():
+                    write_row(row)
+                _close_json_array(f)
+            logger.info(f"Saved {self.row_count} records to {output_path}")
             return True
         except Exception as e:
             logger.error(f"Error saving to JSON: {str(e)}")
@@ -387,11 +562,20 @@ class MHTCutoffParser:
     
     def save_to_csv(self, output_path="mht_cet_cutoffs.csv"):
         """Save the parsed data to a CSV file."""
+        if self.streamed:
+            # Streamed rows were never kept in self.data
+            if self.streamed.get("csv") == output_path:
+                logger.info(f"Rows were written to {output_path} while parsing; nothing to save")
+                return True
+            logger.error(f"Rows were streamed to {', '.join(self.streamed.values())} while parsing; cannot save {output_path}")
+            return False
         try:
-            # The data is already in a flattened format, ready for CSV
-            df = pd.DataFrame(self.data)
-            df.to_csv(output_path, index=False, encoding='utf-8')
-            logger.info(f"Saved {len(self.data)} records to {output_path}")
+            # Rows are rebuilt from the columns as flat tuples in COLUMNS order
+            with open(output_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(self.rows())
+            logger.info(f"Saved {self.row_count} records to {output_path}")
             return True
         except Exception as e:
             logger.error(f"Error saving to CSV: {str(e)}")
@@ -404,30 +588,22 @@ def main():
         logger.error(f"PDF file not found: {pdf_path}")
         return
     
+    # Rows are written to both formats as they are parsed
     parser = MHTCutoffParser(pdf_path)
-    parser.parse_pdf()
+    parser.parse_pdf(output_csv="mht_cet_cutoffs.csv", output_json="mht_cet_cutoffs.json")
     
     # Output basic statistics
-    logger.info(f"Extracted {len(parser.data)} cutoff entries")
+    logger.info(f"Extracted {parser.row_count} cutoff entries")
     
-    if len(parser.data) > 0:
-        # Get unique colleges and courses
-        colleges = set([(item['college_code'], item['college_name']) for item in parser.data])
-        courses = set([(item['course_code'], item['course_name']) for item in parser.data])
-        categories = set([item['category'] for item in parser.data])
-        
-        logger.info(f"Found {len(colleges)} unique colleges")
-        logger.info(f"Found {len(courses)} unique courses")
-        logger.info(f"Found {len(categories)} unique categories")
-        
-        # Save in both formats
-        parser.save_to_json()
-        parser.save_to_csv()
+    if parser.row_count > 0:
+        logger.info(f"Found {len(parser.colleges)} unique colleges")
+        logger.info(f"Found {len(parser.courses)} unique courses")
+        logger.info(f"Found {len(parser.categories)} unique categories")
         
         # Output a sample of the data
         logger.info("Sample of extracted data:")
-        for i, entry in enumerate(parser.data[:3]):
-            logger.info(f"Sample {i+1}: {entry}")
+        for i, entry in enumerate(parser.sample):
+            logger.info(f"Sample {i+1}: {dict(zip(COLUMNS, entry))}")
     else:
         logger.error("No data was extracted from the PDF. Check patterns and parsing logic.")
     
@@ -1,8 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import pyarrow as pa
 import json
 import os
+import re
+
+try:
+    import orjson  # optional, much faster JSON parsing
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick  # pyahocorasick; optional, faster location matching
+except ImportError:
+    ahocorasick = None
 
 # Set page config
 st.set_page_config(
@@ -12,65 +25,274 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Common Maharashtra locations to look for in college names
+LOCATIONS = [
+    "Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad", "Amravati", "Solapur", 
+    "Kolhapur", "Sangli", "Satara", "Thane", "Navi Mumbai", "Ahmednagar", "Jalgaon", 
+    "Dhule", "Nanded", "Chandrapur", "Akola", "Yavatmal", "Ratnagiri", "Raigad", 
+    "Pimpri", "Chinchwad", "Wardha", "Latur", "Beed", "Parbhani", "Jalna"
+]
+
+# Any of the locations, case-insensitively; matched text is mapped back to the
+# canonical spelling through LOCATION_NAMES
+LOCATION_PATTERN = re.compile(
+    "(" + "|".join(re.escape(location) for location in LOCATIONS) + ")",
+    re.IGNORECASE
+)
+LOCATION_NAMES = {location.lower(): location for location in LOCATIONS}
+
+# The same search as one Aho-Corasick automaton over the lowercased locations,
+# when pyahocorasick is installed
+LOCATION_AUTOMATON = None
+if ahocorasick is not None:
+    LOCATION_AUTOMATON = ahocorasick.Automaton()
+    for location in LOCATIONS:
+        LOCATION_AUTOMATON.add_word(location.lower(), location)
+    LOCATION_AUTOMATON.make_automaton()
+
+@st.cache_data
+def _expand_json(path, mtime):
+    """Load the parser's JSON records into a DataFrame (cached per file mtime)"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    # The parser writes one flat record per cutoff
+    return pd.json_normalize(data)
+
+# Largest number of points and distinct colleges (colors) drawn in the
+# Rank vs Percentage scatter; larger results are sampled / grouped into "Other"
+SCATTER_MAX_POINTS = 2000
+SCATTER_MAX_COLLEGES = 20
+
+# Beyond this many filtered rows the scatter gives way to a binned density plot
+DENSITY_MIN_ROWS = 5000
+DENSITY_BINS = 40
+
+# Columns the sidebar filters by equality/membership; load_data indexes on them
+FILTER_INDEX = ["category", "course_name", "status", "seat_type"]
+
 # Load data function
 @st.cache_data
 def load_data():
-    """Load and prepare data for the application"""
-    # Try CSV first (faster for large datasets)
-    if os.path.exists("mht_cet_cutoffs.csv"):
+    """Load and prepare data for the application
+
+    Returns (df, filter_options), where filter_options maps each sidebar filter
+    column to its sorted values, plus the overall min_rank/max_rank, so reruns
+    don't recompute them. df is indexed (and sorted) by FILTER_INDEX.
+    """
+    # Prefer Parquet: columnar, typed and much faster to load than CSV. Only
+    # generate_sample_cutoffs.py writes it, so a CSV/JSON file from a later
+    # parser run takes precedence over it
+    if os.path.exists("mht_cet_cutoffs.parquet") and not any(
+        os.path.exists(path) and os.path.getmtime(path) > os.path.getmtime("mht_cet_cutoffs.parquet")
+        for path in ("mht_cet_cutoffs.csv", "mht_cet_cutoffs.json")
+    ):
+        df = pd.read_parquet("mht_cet_cutoffs.parquet", engine="pyarrow")
+
+    # Then CSV (faster than JSON for large datasets)
+    elif os.path.exists("mht_cet_cutoffs.csv"):
         df = pd.read_csv("mht_cet_cutoffs.csv")
-        
-        # Extract location from college name for filtering
-        df['location'] = df['college_name'].apply(extract_location)
-        
-        return df
-    
+
     # Fallback to JSON if CSV not available
     elif os.path.exists("mht_cet_cutoffs.json"):
-        with open("mht_cet_cutoffs.json", "r") as f:
-            data = json.load(f)
-        
-        # Convert to DataFrame with exploded cutoffs
-        records = []
-        for entry in data:
-            for category, cutoff in entry["cutoffs"].items():
-                record = {
-                    "college_code": entry["college_code"],
-                    "college_name": entry["college_name"],
-                    "course_code": entry["course_code"],
-                    "course_name": entry["course_name"],
-                    "status": entry["status"],
-                    "university": entry["university"],
-                    "seat_type": entry["seat_type"],
-                    "category": category,
-                    "rank": cutoff["rank"],
-                    "percentage": cutoff["percentage"]
-                }
-                records.append(record)
-        
-        df = pd.DataFrame(records)
-        return df
-    
+        df = _expand_json("mht_cet_cutoffs.json", os.path.getmtime("mht_cet_cutoffs.json"))
+
     else:
         st.error("Data files not found. Please run the parser script first.")
-        return None
+        return None, None
+
+    # Extract location from college name for filtering; only the distinct
+    # college names need scanning, not every row
+    df["college_name"] = df["college_name"].astype("category")
+    college_locations = {name: extract_location(name) for name in df["college_name"].cat.categories}
+    df["location"] = df["college_name"].map(college_locations)
+
+    # Low-cardinality text columns as categoricals: filters compare integer
+    # codes instead of hashing strings, and the frame is much smaller
+    for col in ["category", "course_name", "status", "seat_type", "location", "university", "college_name"]:
+        df[col] = df[col].astype("category")
+    df["rank"] = pd.to_numeric(df["rank"], downcast="integer")
+
+    filter_options = {
+        col: df[col].cat.categories.tolist()
+        for col in ["category", "course_name", "status", "seat_type", "location"]
+    }
+    filter_options["min_rank"] = int(df["rank"].min())
+    filter_options["max_rank"] = int(df["rank"].max())
+
+    # Sorted MultiIndex on the equality/isin filter columns; select_rows
+    # matches them as index levels
+    df = df.set_index(FILTER_INDEX).sort_index()
+
+    return df, filter_options
+
+def select_rows(df, categories, courses, statuses, seat_types):
+    """Rows of the FILTER_INDEX-indexed df matching every selection, index reset"""
+    # A boolean mask over the index levels: unlike .loc with label lists, a
+    # combination with no rows gives an empty frame instead of a KeyError
+    mask = np.ones(len(df), dtype=bool)
+    for level, values in zip(FILTER_INDEX, (categories, courses, statuses, seat_types)):
+        mask &= df.index.get_level_values(level).isin(values)
+    return df[mask].reset_index()
+
+@st.cache_data
+def apply_filters(category, courses, statuses, seat_types, locations, rank_range):
+    """Filter the loaded data by the sidebar selections (rows are not sorted)"""
+    df, _ = load_data()
+
+    # Match the FILTER_INDEX levels, then the remaining filters on the rows
+    # that are left
+    filtered_df = select_rows(df, [category], courses, statuses, seat_types)
+    filtered_df = filtered_df[filtered_df["rank"].between(*rank_range)]
+    return filtered_df[filtered_df["location"].isin(locations)]
+
+def best_ranked(df, n):
+    """The n rows of df with the lowest rank, sorted by rank"""
+    ranks = df["rank"].to_numpy()
+    if len(ranks) > n:
+        # O(N) partial selection; only the n selected rows get sorted
+        df = df.iloc[np.argpartition(ranks, n - 1)[:n]]
+    return df.sort_values("rank")
+
+# Chart builders. Plotly Express figure construction is the slowest part of a
+# rerun, so each chart is cached on its input rows and only rebuilt when they change.
+@st.cache_data
+def top_colleges_chart(top_10_colleges, category):
+    """Bar chart of the best-ranked colleges for a category"""
+    fig = px.bar(
+        top_10_colleges,
+        x="college_name",
+        y="rank",
+        color="course_name",
+        labels={"rank": "Cutoff Rank", "college_name": "College Name"},
+        title=f"Top 10 Colleges by Rank for {category}",
+        hover_data=["percentage", "status", "seat_type", "location"],
+    )
+    # Customize layout
+    fig.update_layout(xaxis_tickangle=-45)
+    # Lower rank is better, so invert the y-axis
+    fig.update_yaxes(autorange="reversed")
+    return fig
+
+@st.cache_data
+def rank_percentage_chart(scatter_df):
+    """Scatter of cutoff rank against percentage, colored by college"""
+    fig = px.scatter(
+        scatter_df,
+        x="percentage",
+        y="rank",
+        color="college_name",
+        size="percentage",
+        hover_data=["course_name", "status", "seat_type", "location"],
+        labels={"rank": "Cutoff Rank", "percentage": "Cutoff Percentage"},
+    )
+
+    # Customize layout
+    fig.update_layout(
+        xaxis=dict(title="Percentage (Higher is better)"),
+        yaxis=dict(title="Rank (Lower is better)", autorange="reversed")
+    )
+    return fig
+
+@st.cache_data
+def rank_percentage_density_chart(points_df):
+    """Binned rank against percentage counts, for results too large to scatter"""
+    fig = px.density_heatmap(
+        points_df,
+        x="percentage",
+        y="rank",
+        nbinsx=DENSITY_BINS,
+        nbinsy=DENSITY_BINS,
+        labels={"rank": "Cutoff Rank", "percentage": "Cutoff Percentage"},
+    )
+
+    fig.update_layout(
+        xaxis=dict(title="Percentage (Higher is better)"),
+        yaxis=dict(title="Rank (Lower is better)", autorange="reversed")
+    )
+    return fig
+
+@st.cache_data
+def course_comparison_chart(college_data, college, category):
+    """Bar chart comparing the courses of one college"""
+    fig = px.bar(
+        college_data,
+        x="course_name",
+        y="rank",
+        color="course_name",
+        labels={"rank": "Cutoff Rank", "course_name": "Course Name"},
+        title=f"Course Comparison for {college} ({category})",
+        hover_data=["percentage", "status", "seat_type", "location"],
+        height=500
+    )
+
+    # Customize layout
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        xaxis=dict(title="Course"),
+        yaxis=dict(title="Rank (Lower is better)", autorange="reversed")
+    )
+    return fig
+
+@st.cache_data
+def category_charts(pivot_df):
+    """Heatmap and grouped bar chart of best ranks per college and category"""
+    # Create heatmap using ranks
+    fig = px.density_heatmap(
+        pivot_df,
+        x="category",
+        y="college_name",
+        z="rank",
+        color_continuous_scale="RdYlGn_r",  # Reversed so lower ranks (better) are green
+        labels={"rank": "Cutoff Rank", "college_name": "College", "category": "Category"},
+        title=f"College Ranks Across Different Categories",
+        height=600
+    )
+
+    # Add customized hover information with both rank and percentage
+    hover_temp = "<b>%{y}</b><br>" + \
+                 "Category: %{x}<br>" + \
+                 "Rank: %{z}<br>" + \
+                 "<extra></extra>"
+    fig.update_traces(hovertemplate=hover_temp)
+
+    # Also create a grouped bar chart for better comparison
+    fig2 = px.bar(
+        pivot_df,
+        x="college_name",
+        y="rank",
+        color="category",
+        barmode="group",
+        labels={"rank": "Cutoff Rank", "college_name": "College", "category": "Category"},
+        title=f"College Ranks Across Different Categories",
+        height=500
+    )
+
+    # Customize layout
+    fig2.update_layout(
+        xaxis_tickangle=-45,
+        yaxis=dict(autorange="reversed")  # Lower rank is better
+    )
+    return fig, fig2
 
 # Function to extract location from college name
 def extract_location(college_name):
     """Extract location from college name"""
-    # List of common Maharashtra locations to look for
-    locations = [
-        "Mumbai", "Pune", "Nagpur", "Nashik", "Aurangabad", "Amravati", "Solapur", 
-        "Kolhapur", "Sangli", "Satara", "Thane", "Navi Mumbai", "Ahmednagar", "Jalgaon", 
-        "Dhule", "Nanded", "Chandrapur", "Akola", "Yavatmal", "Ratnagiri", "Raigad", 
-        "Pimpri", "Chinchwad", "Wardha", "Latur", "Beed", "Parbhani", "Jalna"
-    ]
-    
-    # Check if any of the locations are in the college name
-    for location in locations:
-        if location.lower() in college_name.lower():
+    # The first location mentioned in the college name
+    if LOCATION_AUTOMATON is not None:
+        # Leftmost-longest matches in a single pass over the name
+        for _, location in LOCATION_AUTOMATON.iter_long(college_name.lower()):
             return location
-    
+        return "Other"
+
+    match = LOCATION_PATTERN.search(college_name)
+    if match:
+        return LOCATION_NAMES[match.group(1).lower()]
+
     # If no match is found, return "Other"
     return "Other"
 
@@ -82,82 +304,79 @@ def main():
     Find the best colleges based on MHT CET cutoff data. 
     This application helps you analyze the CAP Round-III cutoffs for engineering colleges in Maharashtra.
     """)
-    
+
     # Load data
-    df = load_data()
+    df, filter_options = load_data()
     if df is None:
         st.stop()
-    
+
     # Sidebar filters
     st.sidebar.header("Filters")
-    
+
     # Category filter
-    available_categories = sorted(df["category"].unique())
+    available_categories = filter_options["category"]
     selected_category = st.sidebar.selectbox(
         "Select Category",
         available_categories,
         index=0
     )
-    
+
     # Course filter
-    available_courses = sorted(df["course_name"].unique())
+    available_courses = filter_options["course_name"]
     selected_courses = st.sidebar.multiselect(
         "Select Courses",
         available_courses,
         default=available_courses[:3] if len(available_courses) >= 3 else available_courses
     )
-    
+
     # College status filter
-    available_statuses = sorted(df["status"].unique())
+    available_statuses = filter_options["status"]
     selected_statuses = st.sidebar.multiselect(
         "Select College Status",
         available_statuses,
         default=available_statuses
     )
-    
+
     # Seat type filter
-    available_seat_types = sorted(df["seat_type"].unique())
+    available_seat_types = filter_options["seat_type"]
     selected_seat_types = st.sidebar.multiselect(
         "Select Seat Type",
         available_seat_types,
         default=available_seat_types
     )
-    
+
     # Rank range filter
-    min_rank = int(df["rank"].min())
-    max_rank = int(df["rank"].max())
-    
+    min_rank = filter_options["min_rank"]
+    max_rank = filter_options["max_rank"]
+
     rank_range = st.sidebar.slider(
         "Rank Range",
         min_rank, max_rank,
         (min_rank, int(min_rank + (max_rank - min_rank) * 0.2))
     )
-    
+
     # Location filter
-    available_locations = sorted(df["location"].unique())
+    available_locations = filter_options["location"]
     selected_locations = st.sidebar.multiselect(
         "Select Locations",
         available_locations,
         default=available_locations
     )
-    
-    # Apply filters
-    filtered_df = df[
-        (df["category"] == selected_category) &
-        (df["course_name"].isin(selected_courses)) &
-        (df["status"].isin(selected_statuses)) &
-        (df["seat_type"].isin(selected_seat_types)) &
-        (df["location"].isin(selected_locations)) &
-        (df["rank"] >= rank_range[0]) &
-        (df["rank"] <= rank_range[1])
-    ]
-    
-    # Sort by rank
-    filtered_df = filtered_df.sort_values("rank")
-    
+
+    # Apply filters (cached per selection, so unrelated widgets don't refilter)
+    filter_args = (
+        selected_category,
+        tuple(sorted(selected_courses)),
+        tuple(sorted(selected_statuses)),
+        tuple(sorted(selected_seat_types)),
+        tuple(sorted(selected_locations)),
+        tuple(rank_range)
+    )
+    filtered_df = apply_filters(*filter_args)
+
     # Display results
     st.header("Top Colleges Based on Your Criteria")
-    
+
     if len(filtered_df) == 0:
         st.warning("No colleges match your criteria. Try adjusting your filters.")
     else:
@@ -179,61 +398,79 @@ def main():
             "status", "seat_type", "location"
         ]
         
-        if show_all_colleges:
-            st.dataframe(filtered_df[display_cols], use_container_width=True)
-        else:
-            st.dataframe(filtered_df[display_cols].head(20), use_container_width=True)
+        # Build the table and convert it to Arrow once per filter selection;
+        # reruns from unrelated widgets reuse it instead of re-serializing
+        arrow_key = (filter_args, show_all_colleges)
+        if st.session_state.get("arrow_key") != arrow_key:
+            # Slice the displayed columns once; only the full listing needs every row sorted
+            display_view = filtered_df.loc[:, display_cols]
+            if show_all_colleges:
+                display_view = display_view.sort_values("rank")
+            else:
+                display_view = best_ranked(display_view, 20)
+            
+            # Only ship the category levels that are actually shown to the browser
+            for col in display_view.select_dtypes("category"):
+                display_view[col] = display_view[col].cat.remove_unused_categories()
+            
+            st.session_state.arrow_table = pa.Table.from_pandas(display_view, preserve_index=False)
+            st.session_state.arrow_key = arrow_key
+        
+        st.dataframe(st.session_state.arrow_table, use_container_width=True)
         # Visualizations
         st.header("Visualizations")
         
-        # Create tabs for different visualizations
-        viz_tabs = st.tabs(["College Comparison", "Rank vs Percentage", "Course Comparison", "Category Analysis"])
+        # Pick one visualization at a time; unlike st.tabs, only the selected
+        # view's data prep and figure get built on each rerun
+        view = st.radio(
+            "View",
+            ["College Comparison", "Rank vs Percentage", "Course Comparison", "Category Analysis"],
+            horizontal=True,
+            label_visibility="collapsed"
+        )
         
-        with viz_tabs[0]:
+        if view == "College Comparison":
             st.subheader("Top 10 Colleges by Rank")
             
             # Get top 10 colleges for visualization
-            top_10_colleges = filtered_df.head(10)
+            top_10_colleges = best_ranked(filtered_df, 10)
             
             if len(top_10_colleges) > 0:
-                fig = px.bar(
-                    top_10_colleges,
-                    x="college_name",
-                    y="rank",
-                    color="course_name",
-                    labels={"rank": "Cutoff Rank", "college_name": "College Name"},
-                    title=f"Top 10 Colleges by Rank for {selected_category}",
-                    hover_data=["percentage", "status", "seat_type", "location"],
-                )
-                # Customize layout
-                fig.update_layout(xaxis_tickangle=-45)
-                # Lower rank is better, so invert the y-axis
-                fig.update_yaxes(autorange="reversed")
-                
+                fig = top_colleges_chart(top_10_colleges, selected_category)
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("Not enough data for visualization.")
         
-        with viz_tabs[1]:
+        elif view == "Rank vs Percentage":
             st.subheader("Rank vs Percentage Correlation")
             
-            if len(filtered_df) > 0:
-                fig = px.scatter(
-                    filtered_df,
-                    x="percentage",
-                    y="rank",
-                    color="college_name",
-                    size="percentage",
-                    hover_data=["course_name", "status", "seat_type", "location"],
-                    labels={"rank": "Cutoff Rank", "percentage": "Cutoff Percentage"},
-                )
+            if len(filtered_df) > DENSITY_MIN_ROWS:
+                # Too many rows for a readable scatter; bin them instead
+                st.info(f"Large result ({len(filtered_df)} records) - showing a density plot. Refine the filters to see individual colleges.")
+                fig = rank_percentage_density_chart(filtered_df[["percentage", "rank"]])
+            elif len(filtered_df) > 0:
+                # Plotly builds one trace per color and serializes every point, so
+                # cap both before plotting; the correlation below uses all rows
+                scatter_df = filtered_df
+                if len(scatter_df) > SCATTER_MAX_POINTS:
+                    scatter_df = scatter_df.sample(SCATTER_MAX_POINTS, random_state=0)
+                    st.info(f"Showing a random sample of {SCATTER_MAX_POINTS} of {len(filtered_df)} records.")
                 
-                # Customize layout
-                fig.update_layout(
-                    xaxis=dict(title="Percentage (Higher is better)"),
-                    yaxis=dict(title="Rank (Lower is better)", autorange="reversed")
-                )
+                college_counts = scatter_df["college_name"].value_counts()
+                if (college_counts > 0).sum() > SCATTER_MAX_COLLEGES:
+                    top_colleges = college_counts.index[:SCATTER_MAX_COLLEGES]
+                    scatter_df = scatter_df.assign(
+                        college_name=scatter_df["college_name"].astype(str).where(
+                            scatter_df["college_name"].isin(top_colleges), "Other"
+                        )
+                    )
+                
+                # Legend in rank order; the scatter has at most SCATTER_MAX_POINTS rows
+                scatter_df = scatter_df.sort_values("rank")
                 
+                fig = rank_percentage_chart(scatter_df)
+            
+            if len(filtered_df) > 0:
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Add correlation analysis
@@ -242,13 +479,13 @@ def main():
             else:
                 st.warning("Not enough data for visualization.")
         
-        with viz_tabs[2]:
+        elif view == "Course Comparison":
             st.subheader("Course Comparison")
             
             # Group by college and course to compare courses at the same college
             if len(filtered_df) > 0:
                 # Get most popular colleges (having multiple courses)
-                college_course_counts = filtered_df.groupby("college_name")["course_name"].nunique()
+                college_course_counts = filtered_df.groupby("college_name", observed=True)["course_name"].nunique()
                 colleges_with_multiple_courses = college_course_counts[college_course_counts > 1].index.tolist()
                 
                 if colleges_with_multiple_courses:
@@ -258,34 +495,17 @@ def main():
                     )
                     
                     # Filter data for selected college
-                    college_data = filtered_df[filtered_df["college_name"] == selected_college]
+                    college_data = filtered_df[filtered_df["college_name"] == selected_college].sort_values("rank")
                     
                     # Create bar chart comparing courses
-                    fig = px.bar(
-                        college_data,
-                        x="course_name",
-                        y="rank",
-                        color="course_name",
-                        labels={"rank": "Cutoff Rank", "course_name": "Course Name"},
-                        title=f"Course Comparison for {selected_college} ({selected_category})",
-                        hover_data=["percentage", "status", "seat_type", "location"],
-                        height=500
-                    )
-                    
-                    # Customize layout
-                    fig.update_layout(
-                        xaxis_tickangle=-45,
-                        xaxis=dict(title="Course"),
-                        yaxis=dict(title="Rank (Lower is better)", autorange="reversed")
-                    )
-                    
+                    fig = course_comparison_chart(college_data, selected_college, selected_category)
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.warning("No colleges with multiple courses found in the filtered data.")
             else:
                 st.warning("Not enough data for visualization.")
         
-        with viz_tabs[3]:
+        elif view == "Category Analysis":
             st.subheader("Multi-Category Analysis")
             
             # For this analysis, we need to get data for multiple categories
@@ -300,72 +520,33 @@ def main():
             
             if multi_cat_select:
                 # We'll need to get data for all selected categories
-                multi_cat_data = df[
-                    (df["category"].isin(multi_cat_select)) &
-                    (df["course_name"].isin(selected_courses)) &
-                    (df["status"].isin(selected_statuses)) &
-                    (df["seat_type"].isin(selected_seat_types)) &
-                    (df["rank"] >= rank_range[0]) &
-                    (df["rank"] <= rank_range[1])
-                ]
+                multi_cat_data = select_rows(
+                    df, multi_cat_select, selected_courses, selected_statuses, selected_seat_types
+                )
+                multi_cat_data = multi_cat_data[multi_cat_data["rank"].between(*rank_range)]
                 
                 if len(multi_cat_data) > 0:
                     # Let user select colleges to compare
                     top_n_colleges = st.slider("Number of top colleges to compare", 3, 15, 5)
                     
-                    # Get top N colleges for each category based on rank
-                    top_colleges_by_category = {}
-                    all_top_colleges = set()
-                    
-                    for category in multi_cat_select:
-                        cat_data = multi_cat_data[multi_cat_data["category"] == category]
-                        if len(cat_data) > 0:
-                            top_colleges = cat_data.sort_values("rank").head(top_n_colleges)["college_name"].unique().tolist()
-                            top_colleges_by_category[category] = top_colleges
-                            all_top_colleges.update(top_colleges)
-                    
-                    all_top_colleges = list(all_top_colleges)
+                    # Get top N colleges for each category based on rank: sort once,
+                    # then take the first N rows of every category
+                    top_rows = (
+                        multi_cat_data.sort_values("rank", kind="stable")
+                        .groupby("category", observed=True).head(top_n_colleges)
+                    )
+                    all_top_colleges = top_rows["college_name"].unique().tolist()
                     
                     if all_top_colleges and len(all_top_colleges) <= 15:  # Limit to avoid overcrowding
                         # Create a pivot table for the heatmap
-                        # For each college and category, find the best (minimum) rank
-                        pivot_data = []
-                        
-                        for college in all_top_colleges:
-                            for category in multi_cat_select:
-                                cat_college_data = multi_cat_data[(multi_cat_data["category"] == category) & 
-                                                                 (multi_cat_data["college_name"] == college)]
-                                if len(cat_college_data) > 0:
-                                    best_rank = cat_college_data["rank"].min()
-                                    best_percentage = cat_college_data.loc[cat_college_data["rank"].idxmin(), "percentage"]
-                                    pivot_data.append({
-                                        "college_name": college,
-                                        "category": category,
-                                        "rank": best_rank,
-                                        "percentage": best_percentage
-                                    })
+                        # For each college and category, keep the row with the best (minimum) rank
+                        top_college_data = multi_cat_data[multi_cat_data["college_name"].isin(all_top_colleges)]
+                        best_rows = top_college_data.groupby(["college_name", "category"], observed=True)["rank"].idxmin()
+                        pivot_df = top_college_data.loc[best_rows, ["college_name", "category", "rank", "percentage"]]
                         
-                        if pivot_data:
-                            pivot_df = pd.DataFrame(pivot_data)
-                            
-                            # Create heatmap using ranks
-                            fig = px.density_heatmap(
-                                pivot_df,
-                                x="category",
-                                y="college_name",
-                                z="rank",
-                                color_continuous_scale="RdYlGn_r",  # Reversed so lower ranks (better) are green
-                                labels={"rank": "Cutoff Rank", "college_name": "College", "category": "Category"},
-                                title=f"College Ranks Across Different Categories",
-                                height=600
-                            )
-                            
-                            # Add customized hover information with both rank and percentage
-                            hover_temp = "<b>%{y}</b><br>" + \
-                                         "Category: %{x}<br>" + \
-                                         "Rank: %{z}<br>" + \
-                                         "<extra></extra>"
-                            fig.update_traces(hovertemplate=hover_temp)
+                        if len(pivot_df) > 0:
+                            # Heatmap of ranks plus a grouped bar chart for better comparison
+                            fig, fig2 = category_charts(pivot_df)
                             
                             st.plotly_chart(fig, use_container_width=True)
                             
@@ -373,24 +554,6 @@ def main():
                             st.info("The heatmap shows cutoff ranks across different categories. " + 
                                    "Darker colors represent better ranks (lower numbers).")
                             
-                            # Also create a grouped bar chart for better comparison
-                            fig2 = px.bar(
-                                pivot_df,
-                                x="college_name",
-                                y="rank",
-                                color="category",
-                                barmode="group",
-                                labels={"rank": "Cutoff Rank", "college_name": "College", "category": "Category"},
-                                title=f"College Ranks Across Different Categories",
-                                height=500
-                            )
-                            
-                            # Customize layout
-                            fig2.update_layout(
-                                xaxis_tickangle=-45,
-                                yaxis=dict(autorange="reversed")  # Lower rank is better
-                            )
-                            
                             st.plotly_chart(fig2, use_container_width=True)
                         else:
                             st.warning("Not enough data for comparison across categories.")